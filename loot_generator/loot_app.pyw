@@ -3,6 +3,10 @@ from tkinter import ttk, messagebox, simpledialog
 import tkinter.font as tkfont
 import json
 import os
+import queue
+import threading
+from collections import Counter
+from dataclasses import asdict
 from utils import (
     load_loot_items,
     load_all_tags,
@@ -195,7 +199,8 @@ class LootGeneratorApp:
         self.period_listbox = tk.Listbox(frame, listvariable=tk.StringVar(value=PERIODS), selectmode=tk.MULTIPLE, height=5)
         self.period_listbox.grid(row=6, column=1, sticky=tk.EW)
 
-        ttk.Button(frame, text="Generate Loot", command=self.generate_loot).grid(row=7, column=0, columnspan=2, pady=5)
+        self.generate_button = ttk.Button(frame, text="Generate Loot", command=self.generate_loot)
+        self.generate_button.grid(row=7, column=0, columnspan=2, pady=5)
 
         ttk.Label(frame, text="Search Presets:").grid(row=8, column=0, sticky=tk.W)
         self.preset_search_var = tk.StringVar()
@@ -308,8 +313,11 @@ class LootGeneratorApp:
         selected_periods = [PERIODS[i] for i in self.period_listbox.curselection()]
         periods = selected_periods if selected_periods else None
 
-        loot = generate_loot(
-            self.loot_items,
+        # Generate and format on a worker thread so large loot budgets do not
+        # freeze the window. The result comes back through a queue polled from
+        # the Tk event loop, as widgets may only be updated on the main thread.
+        args = (
+            list(self.loot_items),
             points,
             include_tags,
             exclude_tags,
@@ -317,38 +325,63 @@ class LootGeneratorApp:
             max_rarity,
             max_size,
             periods,
-            self.materials,
+            list(self.materials),
         )
+        results = queue.Queue(maxsize=1)
+        self.generate_button.state(["disabled"])
+        threading.Thread(target=self._generate_worker, args=(args, results), daemon=True).start()
+        self.root.after(50, self._show_generated_loot, results)
+
+    def _generate_worker(self, args, results):
+        try:
+            results.put(self._format_loot(generate_loot(*args)))
+        except Exception as exc:
+            results.put(exc)
+
+    def _show_generated_loot(self, results):
+        try:
+            result = results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self._show_generated_loot, results)
+            return
+        self.generate_button.state(["!disabled"])
+        if isinstance(result, Exception):
+            raise result
 
+        lines, descriptions = result
         self.output_listbox.delete(0, tk.END)
         self.generated_descriptions.clear()
-        if loot:
-            item_counts = {}
-            for item in loot:
-                if item.name in item_counts:
-                    item_counts[item.name]["count"] += 1
-                else:
-                    item_counts[item.name] = {"item": item, "count": 1}
-
-            index = 0
-            for data in item_counts.values():
-                item = data["item"]
-                count = data["count"]
-                tags_str = ", ".join(item.tags)
-                if count > 1:
-                    text = (
-                        f"{count}x {item.name} (Rarity: {item.rarity}, Tags: {tags_str}) [{item.point_value} points each]"
-                    )
-                else:
-                    text = (
-                        f"{item.name} (Rarity: {item.rarity}, Tags: {tags_str}) [{item.point_value} points]"
-                    )
-                self.output_listbox.insert(tk.END, text)
-                self.generated_descriptions[index] = item.description
-                index += 1
-        else:
-            self.output_listbox.insert(tk.END, "No loot items matched your criteria.")
-            self.generated_descriptions[0] = ""
+        self.generated_descriptions.update(descriptions)
+        # A single insert call redraws the listbox once for all lines
+        self.output_listbox.insert(tk.END, *lines)
+
+    @staticmethod
+    def _format_loot(loot):
+        """Return the listbox lines and tooltip descriptions for ``loot``."""
+        if not loot:
+            return ["No loot items matched your criteria."], {0: ""}
+
+        counts = Counter(item.name for item in loot)
+        first_items = {}
+        for item in loot:
+            first_items.setdefault(item.name, item)
+
+        lines = []
+        descriptions = {}
+        for index, (name, count) in enumerate(counts.items()):
+            item = first_items[name]
+            tags_str = ", ".join(item.tags)
+            if count > 1:
+                text = (
+                    f"{count}x {item.name} (Rarity: {item.rarity}, Tags: {tags_str}) [{item.point_value} points each]"
+                )
+            else:
+                text = (
+                    f"{item.name} (Rarity: {item.rarity}, Tags: {tags_str}) [{item.point_value} points]"
+                )
+            lines.append(text)
+            descriptions[index] = item.description
+        return lines, descriptions
 
 
     def load_preset(self):
@@ -757,13 +790,12 @@ class LootGeneratorApp:
         self.update_tag_list()
         with open(get_data_path('loot_items.json'), 'w') as file:
             json.dump({
-                "items": [item.__dict__ for item in self.loot_items],
+                "items": [asdict(item) for item in self.loot_items],
                 "tags": self.all_tags,
             }, file, indent=4)
 
     def update_material_file(self):
-        with open(get_data_path('materials.json'), 'w') as file:
-            json.dump({"materials": [m.__dict__ for m in self.materials]}, file, indent=4)
+        save_materials(self.materials)
 
     def populate_items_tree(self):
         if not hasattr(self, "items_tree"):
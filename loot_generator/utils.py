@@ -1,15 +1,34 @@
+import bisect
+import copy
+import csv
+import itertools
 import json
 import os
 import random
 import re
 import shutil
-from dataclasses import dataclass
-from typing import List, Optional
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from operator import attrgetter
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional, faster JSON backend
+    orjson = None
+
+_json_loads = orjson.loads if orjson else json.loads
 
 # Supported sizes and time periods in increasing order
 SIZES = ["tiny", "small", "midsize", "large", "huge"]
 PERIODS = ["tribal", "medieval", "modern", "postmodern", "spacer"]
 
+# Upper bound on how many weighted draws ``generate_loot`` makes in one batch
+_MAX_DRAW_BATCH = 1024
+
+# Material placeholders such as ``[Metal]``, ``[Wood/Metal/o]`` or ``[Stone/o(-encrusted)]``
+_PLACEHOLDER_RE = re.compile(r"\[([A-Za-z/]+?)(?:(/o))?(?:\(([^\]]+)\))?\]")
+
 @dataclass
 class LootItem:
     name: str
@@ -20,6 +39,14 @@ class LootItem:
     size: str = "midsize"
     period: str = "modern"
 
+    @property
+    def tags_set(self) -> FrozenSet[str]:
+        """``tags`` as a frozenset, cached until ``tags`` is reassigned."""
+        cached = self.__dict__.get("_tags_cache")
+        if cached is None or cached[0] is not self.tags:
+            cached = self.__dict__["_tags_cache"] = (self.tags, frozenset(self.tags))
+        return cached[1]
+
 
 @dataclass
 class Material:
@@ -83,36 +110,70 @@ def get_current_system_dir() -> Optional[str]:
 
 def get_data_path(filename: str) -> str:
     """Return absolute path for ``filename`` within the active dataset."""
-    if _current_system_dir:
-        return os.path.join(_current_system_dir, filename)
+    return _data_path(filename, _current_system_dir)
+
+
+@lru_cache(maxsize=16)
+def _data_path(filename: str, system_dir: Optional[str]) -> str:
+    if system_dir:
+        return os.path.join(system_dir, filename)
     return _resolve(f"data/{filename}")
 
 
+def _file_path(filepath: Optional[str], filename: str) -> str:
+    """Return the absolute path of ``filepath`` or of ``filename`` in the active dataset."""
+    if not filepath:
+        return get_data_path(filename)
+    if not os.path.isabs(filepath):
+        return _resolve(filepath)
+    return filepath
+
+
 def _resolve(path: str) -> str:
     """Return absolute path relative to this module."""
     return os.path.join(BASE_DIR, path)
 
 
+def _read_json(path: str):
+    """Parse the json file at ``path``, using orjson when it is installed.
+
+    Parsed data is cached until the file's modification time or size
+    changes, so callers must copy anything they hand out to be modified.
+    """
+    stat = os.stat(path)
+    return _read_json_cached(path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=8)
+def _read_json_cached(path: str, mtime_ns: int, size: int):
+    with open(path, 'rb') as file:
+        return _json_loads(file.read())
+
+
+def _write_json(path: str, data) -> None:
+    """Write ``data`` to ``path`` as indented json in a single write."""
+    if orjson:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2).encode("utf-8")
+    with open(path, 'wb') as file:
+        file.write(payload)
+
+
 def load_materials(filepath: Optional[str] = None) -> List[Material]:
     """Load material definitions from json file."""
-    path = filepath or get_data_path('materials.json')
-    if not os.path.isabs(path):
-        path = _resolve(path)
+    path = _file_path(filepath, 'materials.json')
     if not os.path.exists(path):
         return []
-    with open(path, 'r') as file:
-        data = json.load(file)
+    data = _read_json(path)
     materials_data = data.get("materials", data)
     return [Material(**m) for m in materials_data]
 
 
 def save_materials(materials: List[Material], filepath: Optional[str] = None) -> None:
     """Save material definitions to json file."""
-    path = filepath or get_data_path('materials.json')
-    if not os.path.isabs(path):
-        path = _resolve(path)
-    with open(path, 'w') as file:
-        json.dump({"materials": [m.__dict__ for m in materials]}, file, indent=4)
+    path = _file_path(filepath, 'materials.json')
+    _write_json(path, {"materials": [asdict(m) for m in materials]})
 
 
 def load_loot_items(filepath: Optional[str] = None):
@@ -121,11 +182,8 @@ def load_loot_items(filepath: Optional[str] = None):
     The file may contain either a list of items or an object with
     ``items`` and ``tags`` keys. Only the item data is returned here.
     """
-    path = filepath or get_data_path('loot_items.json')
-    if not os.path.isabs(path):
-        path = _resolve(path)
-    with open(path, 'r') as file:
-        data = json.load(file)
+    path = _file_path(filepath, 'loot_items.json')
+    data = _read_json(path)
 
     if isinstance(data, dict):
         items_data = data.get("items", [])
@@ -140,7 +198,7 @@ def load_loot_items(filepath: Optional[str] = None):
                 item.get("rarity"),
                 item.get("description", ""),
                 float(item.get("point_value")),
-                item.get("tags", []),
+                list(item.get("tags", [])),
                 item.get("size", "midsize"),
                 item.get("period", "modern"),
             )
@@ -154,14 +212,11 @@ def load_all_tags(filepath: Optional[str] = None):
     For backward compatibility, if the file does not contain a ``tags``
     key the tags are derived from the items.
     """
-    path = filepath or get_data_path('loot_items.json')
-    if not os.path.isabs(path):
-        path = _resolve(path)
-    with open(path, 'r') as file:
-        data = json.load(file)
+    path = _file_path(filepath, 'loot_items.json')
+    data = _read_json(path)
 
     if isinstance(data, dict) and "tags" in data:
-        return data.get("tags", [])
+        return list(data.get("tags", []))
 
     # Older format: derive tags from items list
     items = data if not isinstance(data, dict) else data.get("items", [])
@@ -169,18 +224,12 @@ def load_all_tags(filepath: Optional[str] = None):
     return tags
 
 def load_presets(filepath: Optional[str] = None):
-    path = filepath or get_data_path('presets.json')
-    if not os.path.isabs(path):
-        path = _resolve(path)
-    with open(path, 'r') as file:
-        return json.load(file)
+    path = _file_path(filepath, 'presets.json')
+    return copy.deepcopy(_read_json(path))
 
 def save_presets(presets, filepath: Optional[str] = None):
-    path = filepath or get_data_path('presets.json')
-    if not os.path.isabs(path):
-        path = _resolve(path)
-    with open(path, 'w') as file:
-        json.dump(presets, file, indent=4)
+    path = _file_path(filepath, 'presets.json')
+    _write_json(path, presets)
 
 def generate_loot(
     items: List[LootItem],
@@ -196,39 +245,48 @@ def generate_loot(
     """Generate a list of ``LootItem`` objects matching the given filters."""
     if points <= 0:
         raise ValueError("points must be positive")
+    include_set = frozenset(include_tags) if include_tags else None
+    exclude_set = frozenset(exclude_tags) if exclude_tags else None
+    allowed_sizes = (
+        frozenset(SIZES[: SIZES.index(max_size) + 1]) if max_size is not None else None
+    )
+    allowed_periods = frozenset(periods) if periods is not None else None
+    # Cheap comparisons come first so rejected items skip the tag checks
     filtered_items = [
         item
         for item in items
-        if (not include_tags or set(include_tags).intersection(item.tags))
-        and (not exclude_tags or not set(exclude_tags).intersection(item.tags))
-        and (min_rarity is None or item.rarity >= min_rarity)
+        if (min_rarity is None or item.rarity >= min_rarity)
         and (max_rarity is None or item.rarity <= max_rarity)
-        and (
-            max_size is None
-            or SIZES.index(item.size) <= SIZES.index(max_size)
-        )
-        and (periods is None or item.period in periods)
+        and (allowed_sizes is None or item.size in allowed_sizes)
+        and (allowed_periods is None or item.period in allowed_periods)
+        and (include_set is None or not include_set.isdisjoint(item.tags_set))
+        and (exclude_set is None or exclude_set.isdisjoint(item.tags_set))
     ]
 
-    # Validate rarities and skip items with non-positive values
-    invalid_items = [item for item in filtered_items if item.rarity <= 0]
-    if invalid_items:
-        filtered_items = [item for item in filtered_items if item.rarity > 0]
-        if not filtered_items:
-            invalid_names = ", ".join(item.name for item in invalid_items)
-            raise ValueError(
-                f"All filtered items have non-positive rarity: {invalid_names}"
-            )
-
-    # Filter out items with invalid or zero point values
-    invalid_value_items = [item for item in filtered_items if item.point_value <= 0]
-    if invalid_value_items:
-        filtered_items = [item for item in filtered_items if item.point_value > 0]
-        if not filtered_items:
+    # Skip items with non-positive rarities or point values in a single pass
+    valid_items = []
+    invalid_rarity_items = []
+    invalid_value_items = []
+    for item in filtered_items:
+        if item.rarity <= 0:
+            invalid_rarity_items.append(item)
+        elif item.point_value <= 0:
+            invalid_value_items.append(item)
+        else:
+            valid_items.append(item)
+
+    if not valid_items:
+        if invalid_value_items:
             invalid_names = ", ".join(item.name for item in invalid_value_items)
             raise ValueError(
                 f"All filtered items have non-positive point value: {invalid_names}"
             )
+        if invalid_rarity_items:
+            invalid_names = ", ".join(item.name for item in invalid_rarity_items)
+            raise ValueError(
+                f"All filtered items have non-positive rarity: {invalid_names}"
+            )
+    filtered_items = valid_items
 
     loot = []
     total_points = 0.0
@@ -236,42 +294,96 @@ def generate_loot(
     if not filtered_items:
         return loot
 
+    # Sort by point value so the items that fit the remaining budget always
+    # form a prefix, and keep a running sum of the weights for that order.
+    # A draw is then two binary searches instead of a rebuild of the
+    # candidate list and its weights.
+    filtered_items.sort(key=attrgetter("point_value"))
+    point_values = [i.point_value for i in filtered_items]
+    cum_weights = list(itertools.accumulate(1 / i.rarity for i in filtered_items))
+
+    materials_by_type = index_materials_by_type(materials) if materials else None
+
+    draws = []
     while total_points < points:
         remaining = points - total_points
-        available_items = [i for i in filtered_items if i.point_value <= remaining]
-        if not available_items:
-            break
+        if not draws:
+            count = bisect.bisect_right(point_values, remaining)
+            if not count:
+                # No remaining items can fit the current point total
+                break
+            # Every item in the prefix fits at least this many more times, so
+            # a whole batch can be drawn against the same weights at once.
+            batch = min(int(remaining // point_values[count - 1]), _MAX_DRAW_BATCH)
+            draws = _draw_indices(cum_weights, count, max(batch, 1))
+
+        index = draws.pop()
+        item = filtered_items[index]
+        if item.point_value > remaining:
+            # Drawn before the budget shrank; rejecting it keeps the draw
+            # weighted over the items that still fit.
+            continue
+
+        if not materials:
+            loot.append(LootItem(item.name, item.rarity, item.description, item.point_value, item.tags, item.size, item.period))
+            total_points += item.point_value
+            continue
 
+        # Attempt to resolve material modifiers without exceeding the limit
         added_item = False
-        # Keep trying items until one fits the remaining points
-        while available_items and not added_item:
-            weights = [1 / i.rarity for i in available_items]
-            item = random.choices(available_items, weights=weights, k=1)[0]
-
-            # Attempt to resolve material modifiers without exceeding the limit
-            for _ in range(10000):
-                name, value = item.name, item.point_value
-                if materials:
-                    name, value = resolve_material_placeholders(name, value, materials)
-                if value <= remaining:
-                    loot_item = LootItem(name, item.rarity, item.description, value, item.tags, item.size, item.period)
-                    loot.append(loot_item)
-                    total_points += value
-                    added_item = True
-                    break
-
-            if not added_item:
-                # Discard this item and try another one
-                available_items = [i for i in available_items if i is not item]
+        for _ in range(10000):
+            name, value = resolve_material_placeholders(
+                item.name, item.point_value, materials, materials_by_type
+            )
+            if value <= remaining:
+                loot_item = LootItem(name, item.rarity, item.description, value, item.tags, item.size, item.period)
+                loot.append(loot_item)
+                total_points += value
+                added_item = True
+                break
 
         if not added_item:
-            # No remaining items can fit the current point total
-            break
+            # The item will not fit any smaller budget either, so discard it
+            # and rebuild the weight sums without it.
+            del filtered_items[index]
+            del point_values[index]
+            cum_weights = list(itertools.accumulate(1 / i.rarity for i in filtered_items))
+            draws.clear()
 
     return loot
 
 
-def resolve_material_placeholders(name: str, value: float, materials: List[Material]) -> (str, float):
+def _draw_indices(cum_weights: List[float], count: int, size: int) -> List[int]:
+    """Return ``size`` weighted draws from the first ``count`` cumulative weights."""
+    # Local names keep attribute lookups out of the per-draw loop
+    rand = random.random
+    search = bisect.bisect_left
+    total_weight = cum_weights[count - 1]
+    hi = count - 1
+    return [search(cum_weights, rand() * total_weight, 0, hi) for _ in range(size)]
+
+
+def index_materials_by_type(materials: List[Material]) -> Dict[str, List[int]]:
+    """Map each lowercase material type to the positions of its materials."""
+    by_type: Dict[str, List[int]] = {}
+    for position, material in enumerate(materials):
+        by_type.setdefault(material.type.lower(), []).append(position)
+    return by_type
+
+
+@lru_cache(maxsize=256)
+def _placeholder_types(types_str: str) -> Tuple[str, ...]:
+    """Return the distinct lowercase material types named in a placeholder."""
+    types = (t.strip().lower() for t in types_str.split("/"))
+    return tuple(dict.fromkeys(t for t in types if t))
+
+
+def resolve_material_placeholders(
+    name: str,
+    value: float,
+    materials: List[Material],
+    materials_by_type: Optional[Dict[str, List[int]]] = None,
+) -> (str, float):
     """Replace material placeholders in ``name`` using provided materials.
 
     Placeholders are of the form ``[Metal]`` or ``[Metal/o]``. Multiple material
@@ -281,8 +393,15 @@ def resolve_material_placeholders(name: str, value: float, materials: List[Mater
     string with 50% probability. ``value`` is modified by each material's
     ``modifier``. A suffix can be supplied in parentheses which is appended when
     a material is chosen, e.g. ``[Stone/o(-encrusted)]``.
+
+    ``materials_by_type`` may be given as the result of
+    :func:`index_materials_by_type` for ``materials`` to avoid rebuilding it
+    when resolving many names against the same materials.
     """
-    pattern = re.compile(r"\[([A-Za-z/]+?)(?:(/o))?(?:\(([^\]]+)\))?\]")
+    if "[" not in name:
+        return name.strip(), round(value, 4)
+    if materials_by_type is None:
+        materials_by_type = index_materials_by_type(materials)
     modifiers = 1.0
 
     def repl(match: re.Match) -> str:
@@ -290,19 +409,34 @@ def resolve_material_placeholders(name: str, value: float, materials: List[Mater
         types_str, optional, suffix = match.group(1), match.group(2), match.group(3)
         if optional and random.random() < 0.5:
             return ""
-        types = [t.strip() for t in types_str.split("/") if t.strip()]
-        options = [m for m in materials if m.type.lower() in {t.lower() for t in types}]
+        types = _placeholder_types(types_str)
+        if len(types) == 1:
+            positions = materials_by_type.get(types[0], [])
+        else:
+            positions = sorted(p for t in types for p in materials_by_type.get(t, []))
+        options = [materials[p] for p in positions]
         if not options:
             return ""
         mat = random.choice(options)
         modifiers *= mat.modifier
         return mat.name + (suffix or "")
 
-    new_name = pattern.sub(repl, name)
+    new_name = _PLACEHOLDER_RE.sub(repl, name)
     new_value = round(value * modifiers, 4)
     return new_name.strip(), new_value
 
 
+def _split_fields(text: str):
+    """Yield the ``|`` separated fields of each non-blank line in ``text``."""
+    # QUOTE_NONE keeps quote characters in names and descriptions literal
+    reader = csv.reader(text.splitlines(), delimiter="|", quoting=csv.QUOTE_NONE)
+    for row in reader:
+        parts = [cell.strip() for cell in row]
+        if parts in ([], [""]):
+            continue
+        yield parts
+
+
 def parse_items_text(text: str) -> List[LootItem]:
     """Parse a bulk text string into ``LootItem`` objects.
 
@@ -312,10 +446,7 @@ def parse_items_text(text: str) -> List[LootItem]:
     """
 
     items: List[LootItem] = []
-    for line in text.splitlines():
-        if not line.strip():
-            continue
-        parts = [p.strip() for p in line.split("|")]
+    for parts in _split_fields(text):
         if len(parts) != 7:
             raise ValueError("Each line must contain seven '|' separated fields")
         name, rarity_str, description, value_str, tags_str, size, period = parts
@@ -323,7 +454,7 @@ def parse_items_text(text: str) -> List[LootItem]:
         point_value = float(value_str)
         if point_value < 0.0001:
             raise ValueError("point_value must be at least 0.0001")
-        tags = [t.strip() for t in tags_str.split(",") if t.strip()]
+        tags = list(filter(None, (t.strip() for t in tags_str.split(","))))
         items.append(LootItem(name, rarity, description, point_value, tags, size, period))
 
     return items
@@ -337,10 +468,7 @@ def parse_materials_text(text: str) -> List[Material]:
     """
 
     materials: List[Material] = []
-    for line in text.splitlines():
-        if not line.strip():
-            continue
-        parts = [p.strip() for p in line.split("|")]
+    for parts in _split_fields(text):
         if len(parts) != 3:
             raise ValueError("Each line must contain three '|' separated fields")
         name, modifier_str, type_str = parts
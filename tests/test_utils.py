@@ -3,6 +3,7 @@ import json
 import random
 import tempfile
 import pytest
+from dataclasses import asdict
 from loot_generator import utils
 
 
@@ -242,3 +243,117 @@ def test_generate_loot_material_value_overflow_unresolvable():
     random.seed(0)
     loot = utils.generate_loot(items, points=5, materials=materials)
     assert loot == []
+
+
+def test_generate_loot_weights_by_inverse_rarity():
+    items = [
+        utils.LootItem('Common', 1, '', 1, ['misc']),
+        utils.LootItem('Rare', 4, '', 1, ['misc']),
+    ]
+    random.seed(0)
+    loot = utils.generate_loot(items, points=5000)
+    assert len(loot) == 5000
+    commons = sum(1 for item in loot if item.name == 'Common')
+    # Common items should be drawn roughly four times as often as rare ones
+    assert 3.5 < commons / (len(loot) - commons) < 4.5
+
+
+def test_generate_loot_stays_within_budget():
+    items = [
+        utils.LootItem('Coin', 1, '', 1, ['misc']),
+        utils.LootItem('Gem', 2, '', 7, ['misc']),
+        utils.LootItem('Crown', 3, '', 40, ['misc']),
+    ]
+    random.seed(3)
+    loot = utils.generate_loot(items, points=20)
+    assert sum(item.point_value for item in loot) == 20
+    assert all(item.name != 'Crown' for item in loot)
+
+
+def test_resolve_material_placeholders_with_prebuilt_index():
+    materials = [
+        utils.Material("Iron", 1.2, "Metal"),
+        utils.Material("Oak", 1.3, "Wood"),
+        utils.Material("Ruby", 1.4, "Stone"),
+    ]
+    by_type = utils.index_materials_by_type(materials)
+    assert by_type == {"metal": [0], "wood": [1], "stone": [2]}
+    random.seed(0)
+    name, value = utils.resolve_material_placeholders(
+        "[Wood/Metal/Stone] Ring", 10, materials, by_type
+    )
+    assert name == "Oak Ring"
+    assert value == 13
+
+
+def test_loot_item_tags_set_follows_tags():
+    item = utils.LootItem('Sword', 1, '', 10, ['weapon', 'melee'])
+    assert item.tags_set == frozenset({'weapon', 'melee'})
+    item.tags = ['magic']
+    assert item.tags_set == frozenset({'magic'})
+    assert 'tags_set' not in asdict(item)
+
+
+def test_load_presets_cache_refreshes_and_copies(tmp_path):
+    tmp_file = tmp_path / 'presets.json'
+    utils.save_presets({'A': {'loot_points': 1}}, str(tmp_file))
+    loaded = utils.load_presets(str(tmp_file))
+    loaded['A']['loot_points'] = 99
+    assert utils.load_presets(str(tmp_file)) == {'A': {'loot_points': 1}}
+
+    utils.save_presets({'A': {'loot_points': 1}, 'B': {'loot_points': 2}}, str(tmp_file))
+    assert set(utils.load_presets(str(tmp_file))) == {'A', 'B'}
+
+
+def test_save_and_load_materials_roundtrip(tmp_path):
+    materials = [utils.Material("Steel", 1.2, "Metal"), utils.Material("Oak", 0.8, "Wood")]
+    tmp_file = tmp_path / 'materials.json'
+    utils.save_materials(materials, str(tmp_file))
+    assert utils.load_materials(str(tmp_file)) == materials
+
+
+def test_parse_items_text_skips_blank_lines_and_keeps_quotes():
+    text = '\n  \nGem|1|A "shiny" stone|0.5| misc , |small|modern\n\n'
+    items = utils.parse_items_text(text)
+    assert len(items) == 1
+    assert items[0].description == 'A "shiny" stone'
+    assert items[0].tags == ['misc']
+
+
+def test_generate_loot_size_and_period_filters():
+    items = [
+        utils.LootItem('Ring', 1, '', 5, ['misc'], 'tiny', 'medieval'),
+        utils.LootItem('Statue', 1, '', 5, ['misc'], 'huge', 'medieval'),
+        utils.LootItem('Phone', 1, '', 5, ['misc'], 'small', 'modern'),
+    ]
+    random.seed(0)
+    loot = utils.generate_loot(items, points=20, max_size='small', periods=['medieval'])
+    assert loot
+    assert all(item.name == 'Ring' for item in loot)
+
+
+def test_resolve_material_placeholders_without_placeholders():
+    materials = [utils.Material("Steel", 1.2, "Metal")]
+    name, value = utils.resolve_material_placeholders(" Plain Sword ", 10, materials)
+    assert name == "Plain Sword"
+    assert value == 10
+
+
+def test_generate_loot_invalid_rarities_raise():
+    items = [
+        utils.LootItem('Bad1', 0, '', 5, []),
+        utils.LootItem('Bad2', -1, '', 5, []),
+    ]
+    with pytest.raises(ValueError, match='rarity'):
+        utils.generate_loot(items, points=5)
+
+
+def test_generate_loot_skips_invalid_items_when_valid_remain():
+    items = [
+        utils.LootItem('Bad', 0, '', 5, []),
+        utils.LootItem('Free', 1, '', 0, []),
+        utils.LootItem('Coin', 1, '', 1, []),
+    ]
+    random.seed(0)
+    loot = utils.generate_loot(items, points=5)
+    assert [item.name for item in loot] == ['Coin'] * 5